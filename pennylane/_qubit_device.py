@@ -19,6 +19,8 @@ This module contains the :class:`QubitDevice` abstract base class.
 # e.g. instead of expval(self, observable, wires, par) have expval(self, observable)
 # pylint: disable=arguments-differ, abstract-method, no-value-for-parameter,too-many-instance-attributes
 
+import functools
+
 import numpy as np
 
 from pennylane.operation import Sample, Variance, Expectation, Probability
@@ -26,6 +28,60 @@ from pennylane.qnodes import QuantumFunctionError
 from pennylane import Device
 
 
+@functools.lru_cache(maxsize=64)
+def _binary_helpers(num_wires):
+    """Return the powers of two converting the binary representation of the
+    computational basis states of ``num_wires`` qubits to base 10.
+
+    The result is cached per number of wires and must not be modified.
+
+    Args:
+        num_wires (int): the number of qubits
+
+    Returns:
+        array[int]: the powers of two ``2**k`` for ``k`` in ``range(num_wires - 1, -1, -1)``,
+        such that the first wire corresponds to the most significant bit as in
+        ``np.ravel_multi_index``
+    """
+    powers_of_two = 1 << np.arange(num_wires - 1, -1, -1, dtype=np.int64)
+    powers_of_two.flags.writeable = False
+    return powers_of_two
+
+
+@functools.lru_cache()
+def _numba_eigvals_as_samples():
+    """Compile a Numba kernel replacing the basis state samples by the eigenvalues
+    of an observable in a single parallel pass.
+
+    Numba is imported and the kernel is compiled on the first call only, such that
+    users without Numba installed are not affected.
+
+    Returns:
+        callable or None: the compiled kernel with signature ``(samples, wires, eigvals)``,
+        or ``None`` if Numba is not installed
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import numba
+    except ImportError:
+        return None
+
+    @numba.njit(parallel=True, cache=True)
+    def eigvals_as_samples(samples, wires, eigvals):  # pragma: no cover
+        shots = samples.shape[0]
+        res = np.empty(shots, dtype=eigvals.dtype)
+
+        for i in numba.prange(shots):  # pylint: disable=not-an-iterable
+            idx = 0
+            for wire in wires:
+                idx = (idx << 1) | samples[i, wire]
+            res[i] = eigvals[idx]
+
+        return res
+
+    return eigvals_as_samples
+
+
 class QubitDevice(Device):
     """Abstract base class for PennyLane qubit devices.
 
@@ -36,16 +92,54 @@ class QubitDevice(Device):
             expectation values of observables. Defaults to 1000 if not specified.
     """
     #pylint: disable=too-many-public-methods
+
+    #: frozenset[str]: observables that are diagonal in the computational basis and are not rotated
+    _observables_no_diagonalization = frozenset({"PauliZ", "Identity"})
+
+    #: frozenset[str]: observables with eigenvalues {1, -1} that are sampled from a single wire
+    _pauli_observables = frozenset({"PauliX", "PauliY", "PauliZ", "Hadamard"})
+
+    #: int: number of samples above which the samples are post-processed using Numba, if installed
+    _numba_shots_threshold = 10000
+
     def __init__(self, wires=1, shots=1000, analytic=True):
         super().__init__(wires=wires, shots=shots)
         self.analytic = analytic
 
+        self._prob_cache = None
+
         self._state = None
         self._rotated_prob = None
         self._wires_used = None
         self._memory = None
-        self._samples = None
+        self._samples_packed = None
+        self._samples_packed_wires = None
+        self._samples_binary = None
+
+    @property
+    def _samples(self):
+        """array[int]: the computational basis samples in binary representation, with
+        one column per device wire
+
+        If the samples were generated by :meth:`generate_samples`, they are stored as
+        integers in :attr:`~._samples_packed` and only unpacked on first access.
+        """
+        if self._samples_binary is None and self._samples_packed is not None:
+            wires = self._samples_packed_wires
+            binary_samples = QubitDevice.states_to_binary(self._samples_packed, 1 << wires.size)
 
+            # Columns of the unpacked samples correspond to the device wires, such
+            # that wires not measured by any of the observables remain zero
+            self._samples_binary = np.zeros((len(binary_samples), self.num_wires), dtype=int)
+            self._samples_binary[:, wires] = binary_samples
+
+        return self._samples_binary
+
+    @_samples.setter
+    def _samples(self, samples):
+        self._samples_binary = samples
+        self._samples_packed = None
+        self._samples_packed_wires = None
 
     def reset(self):
         """Reset the backend state.
@@ -110,8 +204,8 @@ class QubitDevice(Device):
 
             # Ensures that a combination with sample does not put
             # expvals and vars in superfluous arrays
-            sample_return_types = (obs.return_type is Sample for obs in observables)
-            if any(sample_return_types) and not all(sample_return_types):
+            num_samples = sum(obs.return_type is Sample for obs in observables)
+            if 0 < num_samples < len(observables):
                 return self._asarray(results, dtype="object")
 
             return self._asarray(results)
@@ -130,26 +224,144 @@ class QubitDevice(Device):
         Returns:
             Union[float, List[float]]: the corresponding statistics
         """
-        results = []
+        dispatch = {
+            Expectation: self.expval,
+            Variance: self.var,
+            Sample: lambda obs: np.array(self.sample(obs)),
+            Probability: lambda obs: self._probability_cached(wires=obs.wires),
+            None: None,
+        }
+
+        stats = [None] * len(observables)
+
+        for idx, obs in enumerate(observables):
+            try:
+                stats[idx] = dispatch[obs.return_type]
+            except KeyError:
+                raise QuantumFunctionError(
+                    "Unsupported return type specified for observable {}".format(obs.name)
+                ) from None
+
+        # share the marginal probabilities between observables acting on the same wires
+        self._prob_cache = {}
+
+        try:
+            batched = self._batch_statistics(observables)
+            results = []
+
+            for idx, (stat, obs) in enumerate(zip(stats, observables)):
+                if idx in batched:
+                    results.append(batched[idx])
+
+                elif stat is not None:
+                    # Pass instances directly
+                    results.append(stat(obs))
+
+        finally:
+            self._prob_cache = None
 
-        for obs in observables:
-            # Pass instances directly
-            if obs.return_type is Expectation:
-                results.append(self.expval(obs))
+        return results
 
-            elif obs.return_type is Variance:
-                results.append(self.var(obs))
+    def _probability_cached(self, wires=None):
+        """Return the (marginal) probability of each computational basis state,
+        reusing the result for the same wires within a single :meth:`statistics` call.
 
-            elif obs.return_type is Sample:
-                results.append(np.array(self.sample(obs)))
+        Outside of :meth:`statistics`, this is equivalent to :meth:`probability`.
 
-            elif obs.return_type is Probability:
-                results.append(self.probability(wires=obs.wires))
+        Args:
+            wires (Sequence[int]): Sequence of wires to return
+                marginal probabilities for
 
-            elif obs.return_type is not None:
-                raise QuantumFunctionError("Unsupported return type specified for observable {}".format(obs.name))
+        Returns:
+            List[float]: list of the probabilities
+        """
+        if self._prob_cache is None:
+            return self.probability(wires=wires)
 
-        return results
+        if wires is None or len(wires) == 0:
+            key = frozenset(range(self.num_wires))
+        else:
+            key = frozenset(np.hstack(wires).tolist())
+
+        if key not in self._prob_cache:
+            self._prob_cache[key] = self.probability(wires=wires)
+
+        return self._prob_cache[key]
+
+    def _batch_statistics(self, observables):
+        """Compute the expectation values and variances of observables acting on
+        the same wires in a single matrix-vector product.
+
+        The observables are grouped by the wires they act on. For each group containing
+        more than one expectation value or variance, the marginal probability is computed
+        once and the (squared) eigenvalues of the observables are stacked into a matrix,
+        which is contracted with the probability.
+
+        Batching is only used in analytic mode, once the basis has been rotated, and if
+        neither :meth:`expval` nor :meth:`var` are overridden.
+
+        .. note::
+
+            QNodes measure each wire at most once, such that batching only applies when
+            calling :meth:`execute` directly with several observables acting on the same
+            wires, e.g., the terms of a Hamiltonian. If no wire is shared between the
+            observables, the grouping is skipped.
+
+        Args:
+            observables (List[:class:`Observable`]): the observables
+
+        Returns:
+            dict[int, float]: the statistics of the batched observables, indexed by
+            the position of the observable in ``observables``
+        """
+        if (
+            not self.analytic
+            or self._rotated_prob is None
+            or type(self).expval is not QubitDevice.expval
+            or type(self).var is not QubitDevice.var
+        ):
+            return {}
+
+        if self._wires_used is not None and self._wires_used.size == sum(
+            self._wire_array(obs).size for obs in observables
+        ):
+            # each wire is measured by at most one observable
+            return {}
+
+        groups = {}
+
+        for idx, obs in enumerate(observables):
+            if obs.return_type is Expectation or obs.return_type is Variance:
+                wires = frozenset(self._wire_array(obs).tolist())
+                groups.setdefault(wires, []).append(idx)
+
+        batched = {}
+
+        for wires, indices in groups.items():
+            if len(indices) < 2:
+                continue
+
+            rows = []
+
+            for idx in indices:
+                eigvals = observables[idx].eigvals
+                rows.append(eigvals)
+
+                if observables[idx].return_type is Variance:
+                    rows.append(eigvals * eigvals)
+
+            prob = self._probability_cached(wires=sorted(wires))
+            moments = iter(np.stack(rows) @ prob)
+
+            for idx in indices:
+                mean = next(moments)
+
+                if observables[idx].return_type is Variance:
+                    batched[idx] = next(moments) - mean.real ** 2
+                else:
+                    batched[idx] = mean.real
+
+        return batched
 
     def rotate_basis(self, obs_queue):
         """Rotates the specified wires such that they
@@ -160,25 +372,42 @@ class QubitDevice(Device):
         """
         self._memory = False
 
-        wires = []
+        wire_arrays = []
 
         for observable in obs_queue:
             if hasattr(observable, "return_type") and observable.return_type == Sample:
                 self._memory = True  # make sure to return samples
 
-            for diag_gate in observable.diagonalizing_gates():
-                self.apply(diag_gate)
+            if self._requires_diagonalization(observable):
+                for diag_gate in observable.diagonalizing_gates():
+                    self.apply(diag_gate)
 
-            for wire in observable.wires:
-                if isinstance(wire, int):
-                    wires.append(wire)
-                else:
-                    wires.extend(wire)
+            wire_arrays.append(self._wire_array(observable))
 
-        # Store the wires used by the observables such that
-        # an Identity is considered on the remaining wires
-        self._wires_used = wires
-        self._rotated_prob = self.probability(wires)
+        # Store the wires used by the observables, sorted and without
+        # duplicates, such that an Identity is considered on the remaining wires
+        if wire_arrays:
+            self._wires_used = np.unique(np.concatenate(wire_arrays)).astype(np.intp)
+        else:
+            self._wires_used = np.array([], dtype=np.intp)
+
+        # pass the wires as a list, such that devices overriding probability
+        # can rely on the truth value of the sequence of wires
+        self._rotated_prob = self.probability(self._wires_used.tolist())
+
+    def _requires_diagonalization(self, observable):
+        """Determine whether the diagonalizing gates of an observable have to be
+        applied before measuring it in the computational basis.
+
+        Args:
+            observable (:class:`Observable`): the observable
+
+        Returns:
+            bool: ``False`` if all factors of the observable are listed in
+            ``_observables_no_diagonalization``
+        """
+        names = observable.name if isinstance(observable.name, list) else [observable.name]
+        return not all(name in self._observables_no_diagonalization for name in names)
 
     def generate_samples(self):
         """Generate computational basis samples based on the current state.
@@ -186,14 +415,18 @@ class QubitDevice(Device):
         If the device contains a sample return type, or the
         device is running in non-analytic mode, ``dev.shots`` number of
         computational basis samples are generated and stored within
-        the :attr:`~._samples` attribute.
+        the :attr:`~._samples_packed` attribute, as the integer representation
+        of the basis states of the wires used by the observables.
 
         .. warning:: This method should be overwritten on devices that
             generate their own computational basis samples.
         """
-        number_of_states = 2**len(self._wires_used)
+        number_of_states = 1 << self._wires_used.size
         samples = self.sample_basis_states(number_of_states, self._rotated_prob)
-        self._samples = QubitDevice.states_to_binary(samples, number_of_states)
+
+        self._samples = None
+        self._samples_packed = np.asarray(samples)
+        self._samples_packed_wires = self._wires_used
 
     def sample_basis_states(self, number_of_states, state_probability):
         """Sample from the computational basis states based on the state
@@ -201,14 +434,25 @@ class QubitDevice(Device):
 
         This is an auxiliary method to the generate_samples method.
 
+        The basis states are sampled by inverting the cumulative distribution
+        of the state probability on uniform random numbers drawn from the
+        global NumPy random state, such that ``np.random.seed`` makes the
+        samples reproducible.
+
         Args:
             number_of_states (int): the number of basis states to sample from
+            state_probability (array[float]): the probability of each basis state
 
         Returns:
             List[int]: the sampled basis states
         """
-        basis_states = np.arange(number_of_states)
-        return np.random.choice(basis_states, self.shots, p=state_probability)
+        # pylint: disable=unused-argument
+        cdf = np.cumsum(state_probability)
+
+        # guard against round-off errors in the cumulative sum
+        cdf[-1] = 1.0
+
+        return np.searchsorted(cdf, np.random.random_sample(self.shots), side="right")
 
     @staticmethod
     def states_to_binary(samples, number_of_states):
@@ -216,6 +460,10 @@ class QubitDevice(Device):
 
         This is an auxiliary method to the generate_samples method.
 
+        The bits of each sample are unpacked using :func:`numpy.unpackbits`,
+        such that the first column corresponds to the most significant bit,
+        matching the ordering of the computational basis states.
+
         Args:
             samples (List[int]): samples of basis states in base 10 representation
             number_of_states (int): the number of basis states to sample from
@@ -223,9 +471,16 @@ class QubitDevice(Device):
         Returns:
             List[int]: basis states in binary representation
         """
-        powers_of_two = (1 << np.arange(number_of_states))
-        states_sampled_base_ten = samples[:, None] & powers_of_two
-        return (states_sampled_base_ten > 0).astype(int)
+        num_wires = int(number_of_states).bit_length() - 1
+        samples = np.asarray(samples)
+
+        if num_wires <= 8:
+            bytes_sampled = samples.astype(np.uint8).reshape(-1, 1)
+        else:
+            bytes_sampled = samples.astype(">u8").view(np.uint8).reshape(-1, 8)
+
+        states_sampled_binary = np.unpackbits(bytes_sampled, axis=1)
+        return states_sampled_binary[:, states_sampled_binary.shape[1] - num_wires:].astype(int)
 
     def expval(self, observable):
         wires = observable.wires
@@ -237,9 +492,10 @@ class QubitDevice(Device):
             self.rotate_basis([observable])
 
         if self.analytic:
-            # exact expectation value
+            # exact expectation value, marginalizing the probability of the full
+            # computational basis, which is shared within a single statistics call
             eigvals = observable.eigvals
-            prob = self.probability(wires=wires)
+            prob = self.marginal_prob(self._probability_cached(), wires)
             return (eigvals @ prob).real
 
         # estimate the ev
@@ -255,16 +511,18 @@ class QubitDevice(Device):
             self.rotate_basis([observable])
 
         if self.analytic:
-            # exact variance value
+            # exact variance value, computing the first and second moments
+            # in a single matrix-vector product
             eigvals = observable.eigvals
-            prob = self.probability(wires=wires)
-            return (eigvals ** 2) @ prob - (eigvals @ prob).real ** 2
+            prob = self.marginal_prob(self._probability_cached(), wires)
+            mean, mean_of_squares = np.stack([eigvals, eigvals * eigvals]) @ prob
+            return mean_of_squares - mean.real ** 2
 
         # estimate the variance
         return np.var(self.sample(observable))
 
     def sample(self, observable):
-        wires = observable.wires
+        wires = self._wire_array(observable)
         name = observable.name
 
         # TODO: remove the following part as we can assume that
@@ -277,12 +535,24 @@ class QubitDevice(Device):
             if self._memory or (not self.analytic):
                 self.generate_samples()
 
-        if isinstance(name, str) and name in {"PauliX", "PauliY", "PauliZ", "Hadamard"}:
+        if isinstance(name, str) and name in self._pauli_observables:
             return self.pauli_eigvals_as_samples(wires)
 
         # Need to post-process the samples using the observables.
         return self.custom_eigvals_as_samples(wires, observable.eigvals)
 
+    @staticmethod
+    def _wire_array(observable):
+        """Return the wires of an observable as a flat integer array.
+
+        Args:
+            observable (:class:`Observable`): the observable
+
+        Returns:
+            array[int]: the wires the observable acts on
+        """
+        return np.hstack(observable.wires).astype(int)
+
     def pauli_eigvals_as_samples(self, wires):
         """Process samples for observables with eigenvalues {1, -1}.
 
@@ -295,8 +565,33 @@ class QubitDevice(Device):
         Returns:
             Sequence[int]: standard eigenvalues
         """
+        shifts = self._packed_bit_shifts(wires[:1])
+
+        if shifts is not None:
+            return 1 - 2 * ((self._samples_packed >> shifts[0]) & 1)
+
         return 1 - 2 * self._samples[:, wires[0]]
 
+    def _packed_bit_shifts(self, wires):
+        """Return the positions of the bits of the given wires in the packed samples.
+
+        Args:
+            wires (Sequence[int]): Sequence of wires
+
+        Returns:
+            array[int] or None: the bit position of each wire, counted from the
+            least significant bit, or ``None`` if no packed samples are available
+            for all of the wires
+        """
+        if self._samples_packed is None:
+            return None
+
+        packed_wires = self._samples_packed_wires
+
+        if not np.all(np.isin(wires, packed_wires)):
+            return None
+
+        return packed_wires.size - 1 - np.searchsorted(packed_wires, wires)
 
     def custom_eigvals_as_samples(self, wires, eigenvalues):
         """Replace the basis state in the computational basis with the correct eigenvalue.
@@ -304,6 +599,14 @@ class QubitDevice(Device):
         Need to post-process the samples using the observables.
         Extract only the columns of the basis samples required based on ``wires``.
 
+        The eigenvalues are expected in the order of the computational basis of the
+        wires sorted in ascending order, as returned by :attr:`~.Observable.eigvals`,
+        such that the smallest wire corresponds to the most significant bit.
+
+        If Numba is installed and the number of samples exceeds
+        :attr:`~._numba_shots_threshold`, the samples are post-processed
+        by a compiled kernel in a single parallel pass.
+
         Args:
             wires (Sequence[int]): Sequence of wires to return
             eigenvalues (Sequence[complex]): eigenvalues of the observable
@@ -311,10 +614,36 @@ class QubitDevice(Device):
         Returns:
             Sequence[complex]: the sampled eigenvalues of the observable
         """
-        wires = np.hstack(wires)
-        samples = self._samples[:, np.array(wires)]
-        unraveled_indices = [2] * len(wires)
-        indices = np.ravel_multi_index(samples.T, unraveled_indices)
+        wires = np.sort(np.hstack(wires))
+        powers_of_two = _binary_helpers(len(wires))
+        shifts = self._packed_bit_shifts(wires)
+
+        if shifts is not None:
+            if shifts.size and np.all(np.diff(shifts) == -1):
+                # the wires occupy consecutive bits of the packed samples in
+                # order, such that the index of the eigenvalue is obtained by
+                # a single shift and mask
+                indices = (self._samples_packed >> shifts[-1]) & ((1 << len(wires)) - 1)
+                return eigenvalues[indices]
+
+            # extract the bits of the wires from the packed samples and
+            # repack them, with the smallest wire as the most significant bit
+            bits = (self._samples_packed[:, None] >> shifts) & 1
+            return eigenvalues[bits @ powers_of_two]
+
+        if len(self._samples) > self._numba_shots_threshold:
+            eigvals_as_samples = _numba_eigvals_as_samples()
+
+            if eigvals_as_samples is not None:
+                return eigvals_as_samples(
+                    np.ascontiguousarray(self._samples),
+                    wires.astype(np.int64),
+                    np.asarray(eigenvalues),
+                )
+
+        # pack the bits of each sample into the index of the basis state,
+        # with the smallest wire corresponding to the most significant bit
+        indices = self._samples[:, wires] @ powers_of_two
         return eigenvalues[indices]
 
     def probability(self, wires=None):
@@ -338,7 +667,9 @@ class QubitDevice(Device):
         if self._state is None:
             return None
 
-        wires = wires or range(self.num_wires)
+        if wires is None or len(wires) == 0:
+            wires = range(self.num_wires)
+
         prob = self.marginal_prob(np.abs(self._state)**2, wires)
         return prob
 
@@ -359,8 +690,10 @@ class QubitDevice(Device):
         Returns:
             list[float]: List of the resulting marginal probabilities.
         """
-        wires = wires or range(self.num_wires)
+        if wires is None or len(wires) == 0:
+            wires = range(self.num_wires)
+
         wires = np.hstack(wires)
-        inactive_wires = list(set(range(self.num_wires)) - set(wires))
-        prob = prob.reshape([2] * self.num_wires)
-        return np.apply_over_axes(np.sum, prob, inactive_wires).flatten()
+        inactive_wires = tuple(np.setdiff1d(np.arange(self.num_wires), wires))
+        prob = np.reshape(prob, [2] * self.num_wires)
+        return prob.sum(axis=inactive_wires).ravel()
@@ -1310,6 +1310,66 @@ class TestDefaultQubitIntegration:
 
         assert np.array_equal(outcomes[0], outcomes[1])
 
+    def test_probability_overridden_with_truth_value_of_wires(self, tol):
+        """Tests that devices overriding the probability method by relying on the truth
+        value of the sequence of wires can be executed"""
+
+        class LegacyProbabilityQubit(qml.plugins.DefaultQubit):
+            """A device computing the marginal probability as in earlier versions"""
+
+            def probability(self, wires=None):
+                if self._state is None:
+                    return None
+
+                wires = wires or range(self.num_wires)
+                return self.marginal_prob(np.abs(self._state) ** 2, wires)
+
+        dev = LegacyProbabilityQubit(wires=2)
+        res = dev.execute([qml.Hadamard(wires=0)], [qml.expval(qml.PauliZ(0)), qml.expval(qml.PauliZ(1))])
+
+        assert np.allclose(res, [0, 1], atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("num_wires", [2, 3, 9])
+    def test_samples_assigned_to_correct_wires(self, num_wires):
+        """Tests that the samples of a basis state are assigned to the
+        correct wires, including when the measured wires are not adjacent"""
+
+        dev = qml.device('default.qubit', wires=num_wires, shots=10)
+
+        @qml.qnode(dev)
+        def circuit():
+            qml.PauliX(wires=0)
+            return qml.sample(qml.PauliZ(0)), qml.sample(qml.PauliZ(num_wires - 1))
+
+        outcomes = circuit()
+
+        assert np.all(outcomes[0] == -1)
+        assert np.all(outcomes[1] == 1)
+
+    @pytest.mark.parametrize("wires", [[0, 2], [2, 0]])
+    def test_sampled_hermitian_matches_analytic(self, wires):
+        """Tests that the mean and variance of the samples of a multi-wire Hermitian
+        observable agree with the analytic expectation value and variance, independent
+        of the order of the wires"""
+        A = np.diag([1, 2, 3, 4])
+
+        def circuit_template(return_type):
+            qml.RX(0.5, wires=0)
+            qml.RX(1.2, wires=2)
+            qml.CNOT(wires=[0, 1])
+            return return_type(qml.Hermitian(A, wires=wires))
+
+        np.random.seed(42)
+        dev = qml.device('default.qubit', wires=3, shots=100000)
+        analytic_dev = qml.device('default.qubit', wires=3)
+
+        samples = qml.QNode(lambda: circuit_template(qml.sample), dev)()
+        expval = qml.QNode(lambda: circuit_template(qml.expval), analytic_dev)()
+        var = qml.QNode(lambda: circuit_template(qml.var), analytic_dev)()
+
+        assert np.allclose(np.mean(samples), expval, atol=0.03, rtol=0)
+        assert np.allclose(np.var(samples), var, atol=0.03, rtol=0)
+
 @pytest.mark.parametrize("theta,phi,varphi", list(zip(THETA, PHI, VARPHI)))
 class TestTensorExpval:
     """Test tensor expectation values"""
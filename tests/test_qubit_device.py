@@ -369,6 +369,156 @@ class TestExtractStatistics:
         ):
            results = mock_qubit_device_extract_stats.statistics([obs])
 
+    def test_statistics_not_grouped_without_shared_wires(self, mock_qubit_device_with_original_statistics, monkeypatch):
+        """Tests that the observables are not grouped if each wire is measured by at most
+        one observable, as is the case for all QNodes"""
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 2
+        dev._rotated_prob = "NotNone"
+        dev._wires_used = np.array([0, 1])
+
+        observables = [qml.expval(qml.PauliZ(0)), qml.var(qml.PauliZ(1))]
+
+        with monkeypatch.context() as m:
+            m.setattr(qml._qubit_device, "frozenset", lambda x: pytest.fail("observables grouped"), raising=False)
+            assert dev._batch_statistics(observables) == {}
+
+    def test_execute_batched_on_same_wires(self, monkeypatch, tol):
+        """Tests that executing diagonal observables acting on the same wires directly
+        on the device returns the same statistics as evaluating them separately, using
+        a single marginal probability"""
+        dev = qml.device("default.qubit", wires=3)
+        queue = [qml.RX(0.3, wires=0), qml.RY(0.7, wires=1), qml.CNOT(wires=[0, 1])]
+
+        A = np.diag([1, 2, 3, 4])
+        observables = [
+            qml.expval(qml.Hermitian(A, wires=[0, 1])),
+            qml.var(qml.PauliZ(0) @ qml.PauliZ(1)),
+            qml.expval(qml.PauliZ(1) @ qml.PauliZ(0)),
+        ]
+
+        expected = [dev.execute(queue, [obs])[0] for obs in observables]
+
+        probability_calls = []
+        original_probability = dev.probability
+
+        def probability_mock(wires=None):
+            probability_calls.append(wires)
+            return original_probability(wires=wires)
+
+        with monkeypatch.context() as m:
+            m.setattr(dev, "probability", probability_mock)
+            results = dev.execute(queue, observables)
+
+        assert np.allclose(results, expected, atol=tol, rtol=0)
+
+        # one call when rotating the basis, and one for the batched observables
+        assert len(probability_calls) == 2
+
+    def test_statistics_batched_on_same_wires(self, mock_qubit_device_with_original_statistics, monkeypatch, tol):
+        """Tests that the expectation values and variances of observables acting on the
+        same wires are computed from a single marginal probability"""
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 2
+
+        state = np.array([random() for i in range(2 ** 2)])
+        state /= np.linalg.norm(state)
+        dev._state = state
+        dev._rotated_prob = "NotNone"
+
+        A = np.diag([1, 2, 3, 4])
+        observables = [
+            qml.expval(qml.Hermitian(A, wires=[0, 1])),
+            qml.var(qml.PauliZ(0) @ qml.PauliZ(1)),
+            qml.expval(qml.PauliZ(1)),
+            qml.expval(qml.PauliZ(1) @ qml.PauliZ(0)),
+        ]
+
+        expected = [dev.expval(observables[0]), dev.var(observables[1]), dev.expval(observables[2]), dev.expval(observables[3])]
+
+        probability_calls = []
+        original_probability = QubitDevice.probability
+
+        def probability_mock(self, wires=None):
+            probability_calls.append(wires)
+            return original_probability(self, wires=wires)
+
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, 'probability', probability_mock)
+            results = dev.statistics(observables)
+
+        assert np.allclose(results, expected, atol=tol, rtol=0)
+
+        # only the observables acting on wires [0, 1] are batched
+        assert probability_calls.count([0, 1]) == 1
+
+    def test_statistics_full_probability_shared(self, mock_qubit_device_with_original_statistics, monkeypatch, tol):
+        """Tests that the expectation values of observables acting on different wires
+        marginalize a single probability of the full computational basis"""
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 3
+
+        state = np.array([random() for i in range(2 ** 3)])
+        state /= np.linalg.norm(state)
+        dev._state = state
+        dev._rotated_prob = "NotNone"
+
+        observables = [
+            qml.expval(qml.PauliZ(0)),
+            qml.expval(qml.Hermitian(np.diag([1, 2, 3, 4]), wires=[2, 1])),
+        ]
+
+        expected = [dev.expval(obs) for obs in observables]
+
+        probability_calls = []
+        original_probability = QubitDevice.probability
+
+        def probability_mock(self, wires=None):
+            probability_calls.append(wires)
+            return original_probability(self, wires=wires)
+
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, 'probability', probability_mock)
+            results = dev.statistics(observables)
+
+        assert np.allclose(results, expected, atol=tol, rtol=0)
+        assert probability_calls == [None]
+
+    def test_statistics_probability_cached(self, mock_qubit_device_with_original_statistics, monkeypatch, tol):
+        """Tests that expectation values and variances share the probability of the full
+        computational basis, that the probability is computed once for each set of
+        wires, and that the cache is cleared afterwards"""
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 2
+
+        state = np.array([random() for i in range(2 ** 2)])
+        state /= np.linalg.norm(state)
+        dev._state = state
+        dev._rotated_prob = "NotNone"
+
+        observables = [qml.var(qml.PauliZ(1)), qml.expval(qml.PauliZ(0))]
+        probs = qml.PauliZ(1)
+        probs.return_type = Probability
+
+        expected = [dev.var(observables[0]), dev.expval(observables[1]), dev.probability(wires=[1])]
+
+        probability_calls = []
+        original_probability = QubitDevice.probability
+
+        def probability_mock(self, wires=None):
+            probability_calls.append(wires)
+            return original_probability(self, wires=wires)
+
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, 'probability', probability_mock)
+            results = dev.statistics(observables + [probs])
+
+        assert np.allclose(results[0], expected[0], atol=tol, rtol=0)
+        assert np.allclose(results[1], expected[1], atol=tol, rtol=0)
+        assert np.allclose(results[2], expected[2], atol=tol, rtol=0)
+        assert probability_calls == [None, [1]]
+        assert dev._prob_cache is None
+
 class TestRotateBasis:
     """Test the rotate_basis method"""
 
@@ -382,7 +532,18 @@ class TestRotateBasis:
         with monkeypatch.context() as m:
             results = mock_qubit_device_extract_stats.rotate_basis(obs_queue)
 
-        assert mock_qubit_device_extract_stats._wires_used == [0, 1]
+        assert np.array_equal(mock_qubit_device_extract_stats._wires_used, [0, 1])
+
+    def test_wires_used_sorted_without_duplicates(self, mock_qubit_device_extract_stats, monkeypatch):
+        """Tests that the rotate_basis method stores the wires used sorted and without duplicates"""
+
+        obs_queue = [qml.PauliX(2) @ qml.PauliZ(0), qml.PauliZ(2)]
+
+        with monkeypatch.context() as m:
+            results = mock_qubit_device_extract_stats.rotate_basis(obs_queue)
+
+        assert np.array_equal(mock_qubit_device_extract_stats._wires_used, [0, 2])
+        assert mock_qubit_device_extract_stats._wires_used.dtype == np.intp
 
     def test_wires_used_correct_for_empyt_obs_queue(self, mock_qubit_device_extract_stats, monkeypatch):
         """Tests that the rotate_basis method correctly stores an empty list when an empty
@@ -395,7 +556,8 @@ class TestRotateBasis:
         with monkeypatch.context() as m:
             results = mock_qubit_device_extract_stats.rotate_basis(obs_queue)
 
-        assert mock_qubit_device_extract_stats._wires_used == []
+        assert np.array_equal(mock_qubit_device_extract_stats._wires_used, [])
+        assert mock_qubit_device_extract_stats._wires_used.dtype == np.intp
 
     def test_probabilities_set_correctly(self, mock_qubit_device_extract_stats, monkeypatch):
         """Tests that the rotate_basis method correctly sets probabilities correctly"""
@@ -407,7 +569,7 @@ class TestRotateBasis:
         with monkeypatch.context() as m:
             mock_qubit_device_extract_stats.rotate_basis(obs_queue)
 
-        assert mock_qubit_device_extract_stats._rotated_prob == [0, 1]
+        assert np.array_equal(mock_qubit_device_extract_stats._rotated_prob, [0, 1])
 
     def test_diagonalizing_gates_applied(self, mock_qubit_device_extract_stats, monkeypatch):
         """Tests that the rotate_basis method applies the diagonalizing gates"""
@@ -422,6 +584,19 @@ class TestRotateBasis:
         assert isinstance(call_history[0], qml.Hadamard)
         assert call_history[0].wires == [0]
 
+    @pytest.mark.parametrize("obs", [qml.PauliZ(0), qml.Identity(0), qml.PauliZ(0) @ qml.PauliZ(1)])
+    def test_diagonal_observables_not_rotated(self, mock_qubit_device_extract_stats, monkeypatch, obs):
+        """Tests that the diagonalizing gates of observables that are already diagonal
+        in the computational basis are not computed"""
+        call_history = []
+        with monkeypatch.context() as m:
+            m.setattr(qml.PauliZ, 'diagonalizing_gates', lambda self: call_history.append(self))
+            m.setattr(qml.Identity, 'diagonalizing_gates', lambda self: call_history.append(self))
+            m.setattr(QubitDevice, 'apply', lambda self, op: call_history.append(op))
+            mock_qubit_device_extract_stats.rotate_basis([obs])
+
+        assert call_history == []
+
     def test_memory_set_if_sample_return_type(self, mock_qubit_device_extract_stats, monkeypatch):
         """Tests that the rotate_basis method sets the _memory attribute correctly"""
 
@@ -453,16 +628,40 @@ class TestGenerateSamples:
     def test_auxiliary_methods_called_correctly(self, mock_qubit_device, monkeypatch):
         """Tests that the generate_samples method calls on its auxiliary methods correctly"""
 
-        mock_qubit_device._wires_used = [1,2]
+        mock_qubit_device._wires_used = np.array([1,2])
         number_of_states = 2 ** len(mock_qubit_device._wires_used)
 
+        sample_basis_states_args = []
+        states_to_binary_args = []
+
+        def sample_basis_states_mock(self, number_of_states, prob):
+            sample_basis_states_args.append(number_of_states)
+            return np.array([0, 1, 2, 3])
+
+        def states_to_binary_mock(samples, number_of_states):
+            states_to_binary_args.append(number_of_states)
+            return np.array([[0, 0], [0, 1], [1, 0], [1, 1]])
+
         with monkeypatch.context() as m:
             # Mock the auxiliary methods such that they return the expected values
-            m.setattr(QubitDevice, 'sample_basis_states', lambda self, wires, b: wires)
-            m.setattr(QubitDevice, 'states_to_binary', lambda a, b: (a, b))
+            m.setattr(QubitDevice, 'sample_basis_states', sample_basis_states_mock)
+            m.setattr(QubitDevice, 'states_to_binary', states_to_binary_mock)
+            mock_qubit_device.num_wires = 3
             mock_qubit_device.generate_samples()
 
-        assert mock_qubit_device._samples == (number_of_states, number_of_states)
+            assert sample_basis_states_args == [number_of_states]
+            assert np.array_equal(mock_qubit_device._samples_packed, [0, 1, 2, 3])
+
+            # the samples are only converted to binary on access
+            assert states_to_binary_args == []
+            binary_samples = mock_qubit_device._samples
+
+        assert states_to_binary_args == [number_of_states]
+
+        # the binary samples are stored in the columns of the wires used
+        assert np.array_equal(binary_samples[:, 0], np.zeros(4))
+        assert np.array_equal(binary_samples[:, 1], [0, 0, 1, 1])
+        assert np.array_equal(binary_samples[:, 2], [0, 1, 0, 1])
 
 class TestSampleBasisStates:
     """Test the sample_basis_states method"""
@@ -476,52 +675,93 @@ class TestSampleBasisStates:
         mock_qubit_device.shots = shots
         state_probs = [0.1, 0.2, 0.3, 0.4]
 
+        uniform_samples = np.array([0.05, 0.15, 0.25, 0.35, 0.65, 0.99])
+        random_calls = []
+
+        def random_sample_mock(size):
+            random_calls.append(size)
+            return uniform_samples
+
         with monkeypatch.context() as m:
-            # Mock the numpy.random.choice method such that it returns the expected values
-            m.setattr("numpy.random.choice", lambda x, y, p: (x, y, p))
+            # Mock the random number generator such that it returns the expected values
+            m.setattr("numpy.random.random_sample", random_sample_mock)
             res = mock_qubit_device.sample_basis_states(number_of_states, state_probs)
 
-        assert np.array_equal(res[0], np.array([0, 1, 2, 3]))
-        assert res[1] == shots
-        assert res[2] == state_probs
+        assert random_calls == [shots]
+        assert np.array_equal(res, np.array([0, 1, 1, 2, 3, 3]))
+
+    @pytest.mark.parametrize("state_probs", [[0, 0, 1, 0], [0.5, 0, 0, 0.5], [0.25] * 4, [0.1, 0.2, 0.3, 0.4]])
+    def test_sampled_states_have_nonzero_probability(self, mock_qubit_device, state_probs):
+        """Tests that the sample_basis_states method returns the correct number of samples,
+        drawn only from the basis states with non-zero probability"""
+        number_of_states = 4
+        mock_qubit_device.shots = 1000
+
+        res = mock_qubit_device.sample_basis_states(number_of_states, np.array(state_probs))
+
+        assert res.shape == (1000,)
+        assert set(res) <= set(np.flatnonzero(state_probs))
+
+    def test_sampling_reproducible_with_global_seed(self, mock_qubit_device):
+        """Tests that seeding the global NumPy random state reproduces the sampled
+        basis states, also after the device has been created"""
+        state_probs = np.array([0.1, 0.2, 0.3, 0.4])
+
+        np.random.seed(42)
+        first = mock_qubit_device.sample_basis_states(4, state_probs)
+
+        np.random.seed(42)
+        second = mock_qubit_device.sample_basis_states(4, state_probs)
+
+        assert np.array_equal(first, second)
+
+    def test_device_creation_does_not_consume_global_random_state(self, mock_qubit_device):
+        """Tests that creating a device does not draw from the global NumPy random state"""
+        np.random.seed(0)
+        expected = np.random.rand()
+
+        np.random.seed(0)
+        QubitDevice()
+        assert np.random.rand() == expected
 
 class TestStatesToBinary:
     """Test the states_to_binary method"""
 
     def test_correct_conversion_two_states(self, mock_qubit_device, monkeypatch):
         """Tests that the sample_basis_states method converts samples to binary correctly"""
-        number_of_states = 2
+        wires = 1
+        number_of_states = 2 ** wires
         basis_states = np.arange(number_of_states)
         samples = np.random.choice(basis_states, mock_qubit_device.shots)
 
         with monkeypatch.context() as m:
             res = mock_qubit_device.states_to_binary(samples, number_of_states)
 
+        assert res.shape == (mock_qubit_device.shots, wires)
         assert np.array_equal(res[:,0], samples)
-        assert np.array_equal(res[:,1], np.zeros(mock_qubit_device.shots))
 
 
-    # Note: in this visual matrix representation, the first columns stands for the first qubit
-    # contrary to the bra-ket notation, so e.g. 2 will be represented as [0, 1, 0, 0] whereas
-    # in bra-ket notation it would be |0010>
+    # Note: the first column stands for the first qubit, which corresponds to the
+    # most significant bit, such that e.g. 2 is represented as [1, 0] on two qubits,
+    # matching the bra-ket notation |10>
     @pytest.mark.parametrize("samples, binary_states",
                             [
                             (
                               np.array([2, 3, 2, 0, 0]),
-                              np.array([[0, 1, 0, 0],
-                                        [1, 1, 0, 0],
-                                        [0, 1, 0, 0],
-                                        [0, 0, 0, 0],
-                                        [0, 0, 0, 0]],
+                              np.array([[1, 0],
+                                        [1, 1],
+                                        [1, 0],
+                                        [0, 0],
+                                        [0, 0]],
                              )
                                ),
                             (
                             np.array([2, 3, 1, 3, 1]),
-                            np.array([[0, 1, 0, 0],
-                                       [1, 1, 0, 0],
-                                       [1, 0, 0, 0],
-                                       [1, 1, 0, 0],
-                                       [1, 0, 0, 0]])
+                            np.array([[1, 0],
+                                       [1, 1],
+                                       [0, 1],
+                                       [1, 1],
+                                       [0, 1]])
 
                             )
                             ])
@@ -540,11 +780,11 @@ class TestStatesToBinary:
                             [
                             (
                             np.array([7, 7, 1, 5, 2]),
-                            np.array([[1, 1, 1, 0, 0, 0, 0, 0],
-                                       [1, 1, 1, 0, 0, 0, 0, 0],
-                                       [1, 0, 0, 0, 0, 0, 0, 0],
-                                       [1, 0, 1, 0, 0, 0, 0, 0],
-                                       [0, 1, 0, 0, 0, 0, 0, 0]])
+                            np.array([[1, 1, 1],
+                                       [1, 1, 1],
+                                       [0, 0, 1],
+                                       [1, 0, 1],
+                                       [0, 1, 0]])
                             )
                             ])
     def test_correct_conversion_eight_states(self, mock_qubit_device, monkeypatch, samples, binary_states, tol):
@@ -558,6 +798,30 @@ class TestStatesToBinary:
 
         assert np.allclose(res, binary_states, atol=tol, rtol=0)
 
+    @pytest.mark.parametrize("wires", [8, 9, 12, 20])
+    def test_correct_conversion_many_wires(self, mock_qubit_device, monkeypatch, wires):
+        """Tests that the states_to_binary method converts samples to binary correctly
+        when more than a single byte is required per sample"""
+        samples = np.array([0, 1, 2 ** (wires - 1), 2 ** wires - 1, 5])
+
+        res = mock_qubit_device.states_to_binary(samples, 2 ** wires)
+        expected = np.array([[int(b) for b in np.binary_repr(s, width=wires)] for s in samples])
+
+        assert res.shape == (len(samples), wires)
+        assert np.array_equal(res, expected)
+
+    @pytest.mark.parametrize("wires", [1, 2, 5, 30, 63])
+    def test_number_of_wires_from_number_of_states(self, mock_qubit_device, wires):
+        """Tests that the states_to_binary method returns one column per wire, derived
+        from the number of basis states"""
+        samples = np.array([0, 1, 2 ** wires - 1])
+
+        res = mock_qubit_device.states_to_binary(samples, 2 ** wires)
+        expected = np.array([[int(b) for b in np.binary_repr(s, width=wires)] for s in samples])
+
+        assert res.shape == (len(samples), wires)
+        assert np.array_equal(res, expected)
+
 
 class TestExpval:
     """Test the expval method"""
@@ -624,6 +888,54 @@ class TestExpval:
 
         assert res == (obs.eigvals @ probs).real
 
+    @pytest.mark.parametrize("obs", [
+        qml.PauliZ(1),
+        qml.PauliX(1),
+        qml.PauliZ(0) @ qml.PauliZ(2),
+        qml.Hermitian(np.diag([1, 2, 3, 4]), wires=[0, 2]),
+        qml.Hermitian(np.diag([1, 2, 3, 4]), wires=[2, 0]),
+    ])
+    def test_analytic_expval_marginal(self, mock_qubit_device_with_original_statistics, monkeypatch, obs, tol):
+        """Tests that the expval method contracts the eigenvalues of an observable
+        with the marginal of the probability of the full computational basis
+
+        Additional QubitDevice methods that are mocked:
+        -rotate_basis
+        """
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 3
+
+        state = np.array([random() for i in range(2 ** 3)])
+        state /= np.linalg.norm(state)
+        dev._state = state
+
+        wires = np.hstack(obs.wires).tolist()
+        expected = obs.eigvals @ dev.marginal_prob(np.abs(state) ** 2, wires=wires)
+
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, 'rotate_basis', lambda self, op: None)
+            res = dev.expval(obs)
+
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    def test_analytic_expval_hermitian_modified_in_place(self, mock_qubit_device_with_original_statistics, monkeypatch, tol):
+        """Tests that the expval method uses the current eigenvalues of a Hermitian
+        observable whose matrix is modified in place between evaluations"""
+        dev = mock_qubit_device_with_original_statistics
+        dev._state = np.array([np.sqrt(0.25), np.sqrt(0.75)])
+
+        A = np.diag([1.0, 2.0])
+        obs = qml.Hermitian(A, wires=0)
+
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, 'rotate_basis', lambda self, op: None)
+            first = dev.expval(obs)
+            A[1, 1] = 6.0
+            second = dev.expval(obs)
+
+        assert np.isclose(first, 0.25 + 0.75 * 2, atol=tol, rtol=0)
+        assert np.isclose(second, 0.25 + 0.75 * 6, atol=tol, rtol=0)
+
     def test_non_analytic_expval(self, mock_qubit_device_with_original_statistics, monkeypatch):
         """Tests that expval method when the analytic attribute is False
 
@@ -927,6 +1239,48 @@ class TestSample:
 
         assert custom_eigvals_call_history == [1]
 
+    def test_wire_array_follows_tensor_mutation(self, mock_qubit_device_with_original_statistics, monkeypatch):
+        """Tests that the sample method passes the wires as an array, which reflects
+        factors added to a tensor in place after it was first sampled"""
+        obs = qml.PauliX(0) @ qml.PauliX(2)
+
+        wires_passed = []
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, 'rotate_basis', lambda self, op: None)
+            m.setattr(QubitDevice, 'custom_eigvals_as_samples', lambda self, wires, eigvals: wires_passed.append(wires))
+            mock_qubit_device_with_original_statistics.sample(obs)
+            obs @= qml.PauliX(1)
+            mock_qubit_device_with_original_statistics.sample(obs)
+
+        assert np.array_equal(wires_passed[0], [0, 2])
+        assert np.array_equal(wires_passed[1], [0, 2, 1])
+
+class TestBinaryHelpers:
+    """Test the cached powers of two"""
+
+    @pytest.mark.parametrize("num_wires", [1, 3, 10])
+    def test_binary_helpers(self, num_wires):
+        """Test that the powers of two are correct, and that the cached array cannot be modified"""
+        powers_of_two = qml._qubit_device._binary_helpers(num_wires)
+
+        assert np.array_equal(powers_of_two, 2 ** np.arange(num_wires)[::-1])
+        assert powers_of_two.dtype == np.int64
+        assert qml._qubit_device._binary_helpers(num_wires) is powers_of_two
+
+        with pytest.raises(ValueError, match="read-only"):
+            powers_of_two[0] = 0
+
+    def test_binary_helpers_ravel_multi_index(self):
+        """Test that the powers of two convert the binary representation of the basis
+        states into their index in the same order as ``np.ravel_multi_index``, also for more
+        wires than fit into the bits of a small integer"""
+        num_wires = 30
+        powers_of_two = qml._qubit_device._binary_helpers(num_wires)
+        bits = np.random.randint(0, 2, size=(5, num_wires))
+
+        expected = np.ravel_multi_index(bits.T, [2] * num_wires)
+        assert np.array_equal(bits @ powers_of_two, expected)
+
 class TestPauliEigvalsAsSamples:
     """Test the pauli_eigvals_as_samples method"""
 
@@ -941,6 +1295,17 @@ class TestPauliEigvalsAsSamples:
 
         assert np.allclose(res ** 2, 1, atol=tol, rtol=0)
 
+    @pytest.mark.parametrize("wires, expected", [([0], [-1, -1, 1]), ([2], [1, -1, -1]), ([1], [1, 1, 1])])
+    def test_packed_samples(self, mock_qubit_device_with_original_statistics, monkeypatch, wires, expected):
+        """Test that pauli_eigvals_as_samples extracts the correct bit from the packed samples"""
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 3
+        dev._samples_packed = np.array([0b10, 0b11, 0b01])
+        dev._samples_packed_wires = np.array([0, 2])
+
+        res = dev.pauli_eigvals_as_samples(wires)
+        assert np.array_equal(res, expected)
+
 class TestCustomEigvalsAsSamples:
     """Test the custom_eigvals_as_samples method"""
 
@@ -957,6 +1322,87 @@ class TestCustomEigvalsAsSamples:
 
         assert np.array_equal(res, np.array([5, 6]))
 
+    def test_correct_custom_eigenvalues_multiple_wires(self, mock_qubit_device_with_original_statistics, monkeypatch):
+        """Test that the smallest of the specified wires corresponds to the most significant bit
+        of the index of the eigenvalue, independent of the order of the wires"""
+        mock_qubit_device_with_original_statistics._samples = np.array([[1, 0, 1], [0, 1, 1], [0, 1, 0]])
+
+        eigenvalues = np.array([6, 5, 12, -54])
+
+        res = mock_qubit_device_with_original_statistics.custom_eigvals_as_samples([0, 2], eigenvalues)
+        assert np.array_equal(res, np.array([-54, 5, 6]))
+
+        res = mock_qubit_device_with_original_statistics.custom_eigvals_as_samples([2, 0], eigenvalues)
+        assert np.array_equal(res, np.array([-54, 5, 6]))
+
+        res = mock_qubit_device_with_original_statistics.custom_eigvals_as_samples([2, 1], eigenvalues)
+        assert np.array_equal(res, np.array([5, -54, 12]))
+
+    @pytest.mark.parametrize("wires, expected", [([0, 2], [12, -54, 5]), ([2, 0], [12, -54, 5]), ([0, 1], [12, 12, 6]), ([2], [6, 5, 5])])
+    def test_packed_samples(self, mock_qubit_device_with_original_statistics, monkeypatch, wires, expected):
+        """Test that custom_eigvals_as_samples extracts the correct bits from the packed samples"""
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 3
+        dev._samples_packed = np.array([0b10, 0b11, 0b01])
+        dev._samples_packed_wires = np.array([0, 2])
+
+        eigenvalues = np.array([6, 5, 12, -54])
+
+        res = dev.custom_eigvals_as_samples(wires, eigenvalues)
+        assert np.array_equal(res, expected)
+
+    @pytest.mark.parametrize("wires", [[0, 1, 2, 3], [1, 2], [0, 1], [3], [0, 2, 3], [3, 1]])
+    def test_packed_samples_consecutive_wires(self, mock_qubit_device_with_original_statistics, monkeypatch, wires):
+        """Test that custom_eigvals_as_samples returns the same eigenvalues for packed samples, including
+        wires occupying consecutive bits, as for the unpacked samples"""
+        dev = mock_qubit_device_with_original_statistics
+        dev.num_wires = 4
+        dev._samples_packed = np.arange(16)
+        dev._samples_packed_wires = np.arange(4)
+
+        eigenvalues = np.random.random(2 ** len(wires))
+
+        res = dev.custom_eigvals_as_samples(wires, eigenvalues)
+
+        # unpack the samples, removing the packed representation
+        dev._samples = dev._samples
+        expected = dev.custom_eigvals_as_samples(wires, eigenvalues)
+
+        assert dev._samples_packed is None
+        assert np.array_equal(res, expected)
+
+    @pytest.mark.parametrize("wires", [[0], [2, 1], [0, 1, 3]])
+    def test_numba_custom_eigenvalues(self, mock_qubit_device_with_original_statistics, monkeypatch, wires):
+        """Test that the Numba kernel returns the same samples of eigenvalues as
+        the NumPy implementation when the number of samples exceeds the threshold"""
+        pytest.importorskip("numba")
+
+        dev = mock_qubit_device_with_original_statistics
+        dev._samples = np.random.randint(0, 2, size=(200, 4))
+        eigenvalues = np.random.random(2 ** len(wires))
+
+        expected = dev.custom_eigvals_as_samples(wires, eigenvalues)
+
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, "_numba_shots_threshold", 100)
+            res = dev.custom_eigvals_as_samples(wires, eigenvalues)
+
+        assert np.array_equal(res, expected)
+
+    def test_numba_not_installed(self, mock_qubit_device_with_original_statistics, monkeypatch):
+        """Test that the samples are post-processed using NumPy if Numba is not installed"""
+        dev = mock_qubit_device_with_original_statistics
+        dev._samples = np.array([[1, 0], [0, 0]])
+
+        eigenvalues = np.array([6, 5, 12, -54])
+
+        with monkeypatch.context() as m:
+            m.setattr(QubitDevice, "_numba_shots_threshold", 0)
+            m.setattr(qml._qubit_device, "_numba_eigvals_as_samples", lambda: None)
+            res = dev.custom_eigvals_as_samples([0], eigenvalues)
+
+        assert np.array_equal(res, np.array([5, 6]))
+
 class TestProbability:
     """Test the probability method"""
 
@@ -1004,7 +1450,7 @@ class TestMarginalProb:
                                                       ([0, 1, 2], []),
                                                       ])
     def test_correct_arguments_for_marginals(self, mock_qubit_device_with_original_statistics, monkeypatch, wires, inactive_wires, tol):
-        """Test that the correct arguments are passed to the marginal_prob method"""
+        """Test that the marginal_prob method sums the probabilities over the inactive wires"""
 
         mock_qubit_device_with_original_statistics.num_wires = 3
 
@@ -1012,20 +1458,16 @@ class TestMarginalProb:
         probs = np.array([random() for i in range(2 ** 3)])
         probs /= sum(probs)
 
-        def apply_over_axes_mock(x, y, p):
-            arguments_apply_over_axes.append((y, p))
-            return np.array([0])
+        expected = np.apply_over_axes(np.sum, probs.reshape([2] * 3), inactive_wires).flatten()
 
-        arguments_apply_over_axes = []
         with monkeypatch.context() as m:
-            m.setattr("numpy.apply_over_axes", apply_over_axes_mock)
             res = mock_qubit_device_with_original_statistics.marginal_prob(probs, wires=wires)
 
-        assert np.array_equal(arguments_apply_over_axes[0][0].flatten(), probs)
-        assert np.array_equal(arguments_apply_over_axes[0][1], inactive_wires)
+        assert res.shape == (2 ** len(wires),)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
 
     def test_correct_arguments_for_marginals_no_wires(self, mock_qubit_device_with_original_statistics, monkeypatch, tol):
-        """Test that the correct arguments are passed to the marginal_prob method with no wires specified"""
+        """Test that the marginal_prob method returns the probabilities unchanged if no wires are specified"""
 
         mock_qubit_device_with_original_statistics.num_wires = 3
 
@@ -1033,17 +1475,10 @@ class TestMarginalProb:
         probs = np.array([random() for i in range(2 ** 3)])
         probs /= sum(probs)
 
-        def apply_over_axes_mock(x, y, p):
-            arguments_apply_over_axes.append((y, p))
-            return np.array([0])
-
-        arguments_apply_over_axes = []
         with monkeypatch.context() as m:
-            m.setattr("numpy.apply_over_axes", apply_over_axes_mock)
             res = mock_qubit_device_with_original_statistics.marginal_prob(probs)
 
-        assert np.array_equal(arguments_apply_over_axes[0][0].flatten(), probs)
-        assert np.array_equal(arguments_apply_over_axes[0][1], [])
+        assert np.allclose(res, probs, atol=tol, rtol=0)
 
     @pytest.mark.parametrize("probs, marginals, wires",
                                     [(np.array([[0.1, 0.2], [0.3, 0.4]]), np.array([0.4, 0.6]), [1]),